@@ -0,0 +1,129 @@
+"""Alert schemas for the generic alert webhook.
+
+Models are defined as msgspec.Struct instead of Pydantic BaseModel: these
+schemas sit on the webhook ingestion hot path and msgspec validates and
+(de)serializes nested payloads in C, so per-alert cost stays low for
+high-volume batches.
+"""
+
+import msgspec
+from enum import Enum
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Literal
+
+
+class AlertType(str, Enum):
+    """Types of alerts that can be received"""
+    SECURITY = "security"
+    PERFORMANCE = "performance"
+    INFRASTRUCTURE = "infrastructure"
+    APPLICATION = "application"
+    BUSINESS = "business"
+    CUSTOM = "custom"
+
+
+class AlertSeverity(str, Enum):
+    """Alert severity levels"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    CRITICAL = "critical"
+
+
+class AlertStatus(str, Enum):
+    """Alert status"""
+    ACTIVE = "active"
+    ACKNOWLEDGED = "acknowledged"
+    RESOLVED = "resolved"
+    CLOSED = "closed"
+
+
+class AlertSource(msgspec.Struct, kw_only=True, omit_defaults=True):
+    """Source system that emitted the alert"""
+    name: str
+    type: str
+    identifier: Optional[str] = None
+
+
+class AlertContext(msgspec.Struct, kw_only=True, omit_defaults=True):
+    """Deployment context the alert applies to"""
+    environment: Optional[str] = None
+    service: Optional[str] = None
+    component: Optional[str] = None
+    region: Optional[str] = None
+    tags: Optional[Dict[str, str]] = None
+
+
+class AlertPayload(msgspec.Struct, kw_only=True, omit_defaults=True):
+    """Single alert payload received via webhook"""
+    alert_id: Optional[str] = None
+    title: str
+    description: str
+    message: str
+    # Literal instead of the Enum classes: membership is checked in C with
+    # no enum construction per field. The Enum classes above stay around as
+    # namespaced constants for callers (str subclasses pass the check).
+    type: Literal[
+        "security", "performance", "infrastructure", "application", "business", "custom"
+    ]
+    severity: Literal["low", "medium", "high", "critical"]
+    status: Literal["active", "acknowledged", "resolved", "closed"] = "active"
+    source: AlertSource
+    context: Optional[AlertContext] = None
+    data: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, float]] = None
+    priority: Optional[int] = None
+    timestamp: Optional[datetime] = None
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Convert to a plain dict (compatibility with the Pydantic API)"""
+        # msgspec handles datetime -> ISO string conversion natively in C,
+        # no per-field post-processing loop needed
+        return msgspec.to_builtins(self)
+
+
+class WebhookRequest(msgspec.Struct, kw_only=True, omit_defaults=True):
+    """Webhook request payload containing a batch of alerts"""
+    alerts: List[AlertPayload]
+    batch_id: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+# Single shared encoder: one C-level pass from struct to JSON bytes,
+# no intermediate dict and no Python-side datetime rewrite
+_RESP_ENC = msgspec.json.Encoder()
+
+
+class WebhookResponse(msgspec.Struct, kw_only=True, omit_defaults=True):
+    """Webhook response"""
+    success: bool
+    message: str
+    processed_count: int
+    workflow_ids: List[str] = []
+    errors: List[str] = []
+    timestamp: Optional[datetime] = None
+
+    def model_dump(self) -> Dict[str, Any]:
+        """Convert to a plain dict (compatibility with the Pydantic API)"""
+        return msgspec.to_builtins(self)
+
+    def to_json_bytes(self) -> bytes:
+        """Encode the response straight to JSON bytes for HTTP handlers"""
+        return _RESP_ENC.encode(self)
+
+
+# Pre-built decoders: constructed once at import, reused for every request,
+# so no validator setup cost is paid per POST. Decoding raw bytes through
+# these skips the Python validator stack entirely.
+webhook_request_decoder = msgspec.json.Decoder(WebhookRequest)
+alert_payload_decoder = msgspec.json.Decoder(AlertPayload)
+
+
+def decode_webhook_request(body: bytes) -> WebhookRequest:
+    """Decode a raw webhook request body into a validated WebhookRequest"""
+    return webhook_request_decoder.decode(body)
+
+
+def decode_alert(body: bytes) -> AlertPayload:
+    """Decode a single raw alert body into a validated AlertPayload"""
+    return alert_payload_decoder.decode(body)
@@ -1,8 +1,21 @@
-from pydantic import BaseModel, Field
+import itertools
+import os
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
+# Cheap unique alert ids: a per-process counter with a pid prefix replaces
+# formatting datetime.utcnow().timestamp() into every id (no datetime
+# allocation, no float __format__, and ids stay unique within a burst)
+_alert_counter = itertools.count()
+_alert_prefix = f"{os.getpid()}-"
+
+
+def _next_alert_id(kind: str, qualifier: str) -> str:
+    """Build a process-unique alert id like 'high-volume-12345-4711-0'"""
+    return f"{kind}-{qualifier}-{_alert_prefix}{next(_alert_counter)}"
+
 
 class MetricType(str, Enum):
     """Types of usage metrics that can trigger alerts"""
@@ -44,6 +57,12 @@ class AlertStatus(str, Enum):
 
 class ThresholdCondition(BaseModel):
     """Threshold condition for triggering alerts"""
+    # Store enum fields as their raw string values so model_dump/encode
+    # skips Enum member reflection on the serialization path. frozen=True
+    # drops the setattr validation hooks - instances are immutable value
+    # objects once built
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
+
     operator: ThresholdOperator
     value: float
     unit: Optional[str] = None  # e.g., "trades", "dollars", "seconds"
@@ -51,6 +70,9 @@ class ThresholdCondition(BaseModel):
 
 class MetricData(BaseModel):
     """Actual metric data that triggered the alert"""
+    # Immutable after validation: no setattr hooks on the hot path
+    model_config = ConfigDict(frozen=True)
+
     metric_name: str
     current_value: float
     threshold_value: float
@@ -62,6 +84,12 @@ class MetricData(BaseModel):
 
 class UsageMetricsAlert(BaseModel):
     """Alert schema for usage-based metrics"""
+    # Raw string values instead of Enum members: dumps go straight to str
+    # with no Enum __str__ hook, and downstream comparisons are str vs str.
+    # Alerts are never mutated in place - status/timestamp changes go
+    # through model_copy(update=...) - so frozen=True skips setattr hooks
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
+
     alert_id: str = Field(..., description="Unique alert identifier")
     metric_type: MetricType = Field(..., description="Type of metric that triggered the alert")
     severity: AlertSeverity = Field(..., description="Alert severity level")
@@ -86,19 +114,20 @@ class UsageMetricsAlert(BaseModel):
     # Additional context
     tags: List[str] = Field(default_factory=list, description="Tags for categorization")
     context: Optional[Dict[str, Any]] = Field(default=None, description="Additional context data")
-    
+
     def model_dump(self, **kwargs):
-        """Override model_dump to handle datetime serialization"""
-        data = super().model_dump(**kwargs)
-        # Convert datetime objects to ISO format strings
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
-        return data
+        """Dump with JSON-compatible types by default"""
+        # mode="json" runs pydantic-core's Rust serializer, which converts
+        # every datetime (including nested ones like metric_data.timestamp)
+        # to an ISO string in one pass - no Python-side key loop
+        kwargs.setdefault("mode", "json")
+        return super().model_dump(**kwargs)
 
 
 class WebhookRequest(BaseModel):
     """Webhook request payload for usage metrics alerts"""
+    model_config = ConfigDict(frozen=True)
+
     alerts: List[UsageMetricsAlert] = Field(..., description="List of usage metrics alerts")
     batch_id: Optional[str] = Field(default=None, description="Batch identifier for multiple alerts")
     source_system: str = Field(default="EasyTrade", description="Source system name")
@@ -113,85 +142,104 @@ class WebhookResponse(BaseModel):
     workflow_ids: List[str] = Field(default_factory=list, description="List of workflow IDs created")
     errors: List[str] = Field(default_factory=list, description="List of errors if any")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Response timestamp")
-    
+
     def model_dump(self, **kwargs):
-        """Override model_dump to handle datetime serialization"""
-        data = super().model_dump(**kwargs)
-        # Convert datetime objects to ISO format strings
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
-        return data
+        """Dump with JSON-compatible types by default"""
+        kwargs.setdefault("mode", "json")
+        return super().model_dump(**kwargs)
 
 
 # Example alert creators for different metric types
-def create_high_volume_alert(account_id: str, current_volume: float, threshold: float) -> UsageMetricsAlert:
+def create_high_volume_alert(account_id: str, current_volume: float, threshold: float,
+                             now: Optional[datetime] = None) -> UsageMetricsAlert:
     """Create an alert for high trade volume"""
-    return UsageMetricsAlert(
-        alert_id=f"high-volume-{account_id}-{datetime.utcnow().timestamp()}",
+    # Callers creating a batch can pass one shared clock read; otherwise
+    # each factory reads the clock exactly once
+    if now is None:
+        now = datetime.utcnow()
+    # Shared fragment formatted once and reused by title and description
+    account = f"Account {account_id}"
+    # model_construct skips pydantic-core validation entirely: this data was
+    # just produced by the factory itself, so there is nothing to validate.
+    # Inbound webhook payloads still go through the full validators.
+    return UsageMetricsAlert.model_construct(
+        alert_id=_next_alert_id("high-volume", account_id),
         metric_type=MetricType.TRADE_VOLUME,
         severity=AlertSeverity.HIGH,
-        threshold_condition=ThresholdCondition(
+        threshold_condition=ThresholdCondition.model_construct(
             operator=ThresholdOperator.GREATER_THAN,
             value=threshold,
             unit="trades"
         ),
-        metric_data=MetricData(
+        metric_data=MetricData.model_construct(
             metric_name="trade_volume",
             current_value=current_volume,
             threshold_value=threshold,
             account_id=account_id,
-            timestamp=datetime.utcnow()
+            timestamp=now
         ),
-        title=f"High Trade Volume Alert - Account {account_id}",
-        description=f"Account {account_id} has exceeded the trade volume threshold of {threshold} trades. Current volume: {current_volume}",
+        created_at=now,
+        title=f"High Trade Volume Alert - {account}",
+        description=f"{account} has exceeded the trade volume threshold of {threshold} trades. Current volume: {current_volume}",
         tags=["volume", "trading", "account"]
     )
 
 
-def create_sla_violation_alert(trade_type: str, current_latency: float, threshold: float) -> UsageMetricsAlert:
+def create_sla_violation_alert(trade_type: str, current_latency: float, threshold: float,
+                               now: Optional[datetime] = None) -> UsageMetricsAlert:
     """Create an alert for SLA violation"""
-    return UsageMetricsAlert(
-        alert_id=f"sla-violation-{trade_type}-{datetime.utcnow().timestamp()}",
+    if now is None:
+        now = datetime.utcnow()
+    return UsageMetricsAlert.model_construct(
+        alert_id=_next_alert_id("sla-violation", trade_type),
         metric_type=MetricType.SLA_VIOLATION,
         severity=AlertSeverity.CRITICAL,
-        threshold_condition=ThresholdCondition(
+        threshold_condition=ThresholdCondition.model_construct(
             operator=ThresholdOperator.GREATER_THAN,
             value=threshold,
             unit="seconds"
         ),
-        metric_data=MetricData(
+        metric_data=MetricData.model_construct(
             metric_name="response_latency",
             current_value=current_latency,
             threshold_value=threshold,
             trade_type=trade_type,
-            timestamp=datetime.utcnow()
+            timestamp=now
         ),
+        created_at=now,
         title=f"SLA Violation Alert - {trade_type}",
         description=f"{trade_type} operations are exceeding SLA threshold of {threshold}s. Current latency: {current_latency}s",
         tags=["sla", "latency", "performance"]
     )
 
 
-def create_high_value_transaction_alert(account_id: str, trade_amount: float, threshold: float) -> UsageMetricsAlert:
+def create_high_value_transaction_alert(account_id: str, trade_amount: float, threshold: float,
+                                        now: Optional[datetime] = None) -> UsageMetricsAlert:
     """Create an alert for high value transactions"""
-    return UsageMetricsAlert(
-        alert_id=f"high-value-{account_id}-{datetime.utcnow().timestamp()}",
+    if now is None:
+        now = datetime.utcnow()
+    # Format the shared fragment and the two currency values exactly once
+    account = f"Account {account_id}"
+    amount_str = f"${trade_amount:.2f}"
+    threshold_str = f"${threshold:.2f}"
+    return UsageMetricsAlert.model_construct(
+        alert_id=_next_alert_id("high-value", account_id),
         metric_type=MetricType.TRADE_VALUE,
         severity=AlertSeverity.MEDIUM,
-        threshold_condition=ThresholdCondition(
+        threshold_condition=ThresholdCondition.model_construct(
             operator=ThresholdOperator.GREATER_THAN,
             value=threshold,
             unit="dollars"
         ),
-        metric_data=MetricData(
+        metric_data=MetricData.model_construct(
             metric_name="trade_value",
             current_value=trade_amount,
             threshold_value=threshold,
             account_id=account_id,
-            timestamp=datetime.utcnow()
+            timestamp=now
         ),
-        title=f"High Value Transaction Alert - Account {account_id}",
-        description=f"Account {account_id} has made a high-value transaction of ${trade_amount:.2f}, exceeding threshold of ${threshold:.2f}",
+        created_at=now,
+        title=f"High Value Transaction Alert - {account}",
+        description=f"{account} has made a high-value transaction of {amount_str}, exceeding threshold of {threshold_str}",
         tags=["value", "transaction", "account"]
     ) 
\ No newline at end of file
@@ -6,15 +6,20 @@ Handles all Temporal workflows: Upsell, Alert Processing, and Sample workflows
 
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from temporalio.client import Client
+from temporalio.service import KeepAliveConfig
 from temporalio.worker import Worker
 
+from payload_converter import ORJSON_DATA_CONVERTER
+
 # Import all workflows and activities from the consolidated file
 from all_workflows import (
     # Workflows
     UpsellWorkflow,
     SampleWorkflow,
-    
+    AlertDispatchWorkflow,
+
     # Activities
     fetch_usage,
     fetch_contract,
@@ -34,8 +39,16 @@ async def main():
     """Main worker function"""
     logger.info("🚀 Starting Consolidated Temporal Worker")
     
-    # Connect to Temporal server
-    client = await Client.connect("localhost:7233")
+    # Connect to Temporal server (orjson converter keeps payload
+    # serialization off the pure-Python json path). Explicit gRPC keepalive
+    # pings hold the multiplexed channel open through transient network
+    # blips instead of forcing a reconnect storm; reuse this one client for
+    # any secondary workers rather than calling Client.connect again.
+    client = await Client.connect(
+        "localhost:7233",
+        data_converter=ORJSON_DATA_CONVERTER,
+        keep_alive_config=KeepAliveConfig(interval_millis=30_000, timeout_millis=15_000)
+    )
     logger.info("✅ Connected to Temporal server")
     
     # Create worker with all workflows and activities
@@ -44,7 +57,8 @@ async def main():
         task_queue="consolidated-task-queue",
         workflows=[
             UpsellWorkflow,
-            SampleWorkflow
+            SampleWorkflow,
+            AlertDispatchWorkflow
         ],
         activities=[
             # Upsell workflow activities
@@ -55,12 +69,20 @@ async def main():
             post_slack_summary,
             create_zoom_meeting,
             log_opportunity
-        ]
+        ],
+        # All activities are I/O-bound network calls, so wide concurrency
+        # just overlaps remote latency - throughput scales with in-flight
+        # activities until the downstream services become the bottleneck
+        max_concurrent_activities=100,
+        max_concurrent_workflow_tasks=50,
+        max_concurrent_activity_task_polls=10,
+        max_concurrent_workflow_task_polls=5
     )
     
     logger.info("📋 Registered workflows:")
     logger.info("   • UpsellWorkflow")
     logger.info("   • SampleWorkflow")
+    logger.info("   • AlertDispatchWorkflow")
     
     logger.info("🔧 Registered activities:")
     logger.info("   • fetch_usage, fetch_contract, ask_claude_for_plan")
@@ -75,4 +97,22 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    # uvloop's libuv-backed event loop cuts per-await overhead for the
+    # gRPC/network-bound worker; fall back to the default loop if missing
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+        logger.info("⚡ Using uvloop event loop")
+    except ImportError:
+        loop = asyncio.new_event_loop()
+        logger.info("uvloop not installed - using default asyncio event loop")
+
+    # An explicit loop (vs asyncio.run) lets us size the default executor
+    # that Temporal uses for any sync activity work, and avoids rebuilding
+    # loop internals when a supervisor restarts the worker entrypoint
+    asyncio.set_event_loop(loop)
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=64))
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+orjson-backed Temporal Payload Converter
+Drop-in replacement for the default JSON payload converter so activity
+inputs/outputs are (de)serialized by orjson's C encoder instead of the
+pure-Python stdlib json tokenizer.
+"""
+
+import dataclasses
+from typing import Any, Optional, Type
+
+import orjson
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    JSONPlainPayloadConverter,
+    value_to_type,
+)
+
+
+class OrjsonPayloadConverter(JSONPlainPayloadConverter):
+    """JSON payload converter that encodes/decodes with orjson"""
+
+    def to_payload(self, value: Any) -> Optional[Payload]:
+        try:
+            data = orjson.dumps(value, default=str, option=orjson.OPT_NAIVE_UTC)
+        except (TypeError, orjson.JSONEncodeError):
+            return None
+        return Payload(metadata={"encoding": self.encoding.encode()}, data=data)
+
+    def from_payload(self, payload: Payload, type_hint: Optional[Type] = None) -> Any:
+        obj = orjson.loads(payload.data)
+        if type_hint is not None:
+            obj = value_to_type(type_hint, obj)
+        return obj
+
+
+class OrjsonCompositePayloadConverter(CompositePayloadConverter):
+    """Default converter chain with the JSON converter swapped for orjson"""
+
+    def __init__(self) -> None:
+        super().__init__(
+            *(
+                OrjsonPayloadConverter()
+                if isinstance(converter, JSONPlainPayloadConverter)
+                else converter
+                for converter in DefaultPayloadConverter.default_encoding_payload_converters
+            )
+        )
+
+
+# Data converter to pass to Client.connect so both the worker and the
+# webhook client encode activity payloads through orjson
+ORJSON_DATA_CONVERTER = dataclasses.replace(
+    DataConverter.default,
+    payload_converter_class=OrjsonCompositePayloadConverter,
+)